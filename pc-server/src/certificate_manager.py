@@ -1,12 +1,14 @@
 """SSL certificate generation and fingerprint calculation."""
 import hashlib
 import ipaddress
+import ssl
 from pathlib import Path
+from typing import Optional
 from cryptography import x509
 from cryptography.x509.oid import NameOID
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
-from datetime import datetime, timedelta
+from cryptography.hazmat.primitives.asymmetric import ec
+from datetime import datetime, timedelta, timezone
 import socket
 
 
@@ -19,6 +21,10 @@ class CertificateManager:
         self.device_name = device_name
         self._private_key = None
         self._certificate = None
+        self._cert_der: Optional[bytes] = None
+        self._fingerprint_bytes: Optional[bytes] = None
+        self._fingerprint: Optional[str] = None
+        self._ssl_context: Optional[ssl.SSLContext] = None
         
     def ensure_certificate_exists(self) -> None:
         """Generate certificate and key if they don't exist."""
@@ -29,15 +35,15 @@ class CertificateManager:
             
     def _generate_certificate(self) -> None:
         """Generate a self-signed SSL certificate."""
-        # Generate private key
-        self._private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=2048
-        )
+        # Generate private key (ECDSA P-256: near-instant keygen unlike RSA,
+        # and supported by Android's TLS stack, which Ed25519 certs are not)
+        self._private_key = ec.generate_private_key(ec.SECP256R1())
         
         # Get hostname
         hostname = socket.gethostname()
         
+        now = datetime.now(timezone.utc)
+        
         # Create certificate
         subject = issuer = x509.Name([
             x509.NameAttribute(NameOID.COUNTRY_NAME, "US"),
@@ -56,9 +62,9 @@ class CertificateManager:
         ).serial_number(
             x509.random_serial_number()
         ).not_valid_before(
-            datetime.utcnow()
+            now
         ).not_valid_after(
-            datetime.utcnow() + timedelta(days=3650)  # 10 years
+            now + timedelta(days=3650)  # 10 years
         ).add_extension(
             x509.SubjectAlternativeName([
                 x509.DNSName(hostname),
@@ -80,6 +86,11 @@ class CertificateManager:
                 encryption_algorithm=serialization.NoEncryption()
             ))
             
+        self._cert_der = self._certificate.public_bytes(serialization.Encoding.DER)
+        self._fingerprint_bytes = hashlib.sha256(self._cert_der).digest()
+        self._fingerprint = None  # Formatted lazily
+        # Any cached context was built from the old certificate
+        self._ssl_context = None
         print(f"Generated SSL certificate: {self.cert_file}")
         
     def _load_certificate(self) -> None:
@@ -93,22 +104,22 @@ class CertificateManager:
                 password=None
             )
             
-    def get_certificate_fingerprint(self) -> str:
-        """Calculate SHA-256 fingerprint in Android format: SHA256:HEX_UPPERCASE."""
-        if not self._certificate:
-            self._load_certificate()
+        self._cert_der = self._certificate.public_bytes(serialization.Encoding.DER)
+        self._fingerprint_bytes = hashlib.sha256(self._cert_der).digest()
+        self._fingerprint = None  # Formatted lazily
             
-        # Get encoded certificate bytes
-        cert_bytes = self._certificate.public_bytes(serialization.Encoding.DER)
+    def get_certificate_fingerprint_bytes(self) -> bytes:
+        """Get raw 32-byte SHA-256 digest of the DER-encoded certificate."""
+        if self._fingerprint_bytes is None:
+            self.ensure_certificate_exists()
+        return self._fingerprint_bytes
         
-        # Calculate SHA-256 hash
-        digest = hashlib.sha256(cert_bytes).digest()
-        
-        # Format as uppercase hex string
-        hex_fingerprint = digest.hex().upper()
-        
-        # Return in Android format: SHA256:HEX_UPPERCASE
-        return f"SHA256:{hex_fingerprint}"
+    def get_certificate_fingerprint(self) -> str:
+        """Get SHA-256 fingerprint in Android format: SHA256:HEX_UPPERCASE."""
+        if self._fingerprint is None:
+            hex_fingerprint = self.get_certificate_fingerprint_bytes().hex().upper()
+            self._fingerprint = f"SHA256:{hex_fingerprint}"
+        return self._fingerprint
         
     def get_certificate_path(self) -> Path:
         """Get path to certificate file."""
@@ -118,10 +129,17 @@ class CertificateManager:
         """Get path to private key file."""
         return self.key_file
         
-    def get_ssl_context(self):
-        """Get SSL context for WebSocket server."""
-        import ssl
+    def get_ssl_context(self) -> ssl.SSLContext:
+        """
+        Get SSL context for WebSocket server (built once and cached).
         
+        Session tickets are keyed to this context, so callers should keep
+        using the same object for the server's lifetime; that lets
+        reconnecting clients resume instead of doing a full handshake.
+        """
+        if self._ssl_context is not None:
+            return self._ssl_context
+            
         if not self._certificate:
             self._load_certificate()
             
@@ -130,5 +148,6 @@ class CertificateManager:
             str(self.cert_file),
             str(self.key_file)
         )
+        self._ssl_context = context
         return context
 
@@ -1,4 +1,5 @@
 """Platform-specific clipboard monitoring."""
+import hashlib
 import platform
 import time
 import threading
@@ -6,6 +7,68 @@ from typing import Optional, Callable
 import pyperclip
 
 
+class _XFixesChangeCounter:
+    """Counts CLIPBOARD ownership changes reported by the X server (XFixes)."""
+    
+    def __init__(self):
+        from Xlib import display
+        from Xlib.ext import xfixes
+        
+        self._display = display.Display()
+        if not self._display.has_extension("XFIXES"):
+            raise RuntimeError("XFIXES extension not available")
+        self._display.xfixes_query_version()
+        self._display.xfixes_select_selection_input(
+            self._display.screen().root,
+            self._display.intern_atom("CLIPBOARD"),
+            xfixes.XFixesSetSelectionOwnerNotifyMask
+        )
+        self._count = 0
+        
+    def __call__(self) -> int:
+        # Drain queued selection-owner notifications without blocking
+        while self._display.pending_events():
+            self._display.next_event()
+            self._count += 1
+        return self._count
+        
+    def close(self) -> None:
+        """Close the X server connection."""
+        self._display.close()
+
+
+def _content_signature(payload: bytes) -> tuple[int, bytes]:
+    """
+    Identify UTF-8 encoded clipboard content by length plus a 128-bit BLAKE2b digest.
+    
+    Lets the monitor remember what it last saw without keeping a reference
+    to a potentially multi-megabyte string.
+    """
+    return len(payload), hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def _create_change_counter() -> Optional[Callable[[], int]]:
+    """
+    Get a cheap clipboard change counter for the current platform.
+    
+    Returns None if no native notification source is available, in which
+    case the monitor falls back to reading the clipboard on every poll.
+    """
+    system = platform.system()
+    try:
+        if system == "Windows":
+            import ctypes
+            return ctypes.windll.user32.GetClipboardSequenceNumber
+        if system == "Darwin":
+            from AppKit import NSPasteboard
+            return NSPasteboard.generalPasteboard().changeCount
+        if system == "Linux":
+            return _XFixesChangeCounter()
+    except Exception:
+        pass
+    return None
+
+
 class ClipboardMonitor:
     """Monitors PC clipboard for changes."""
     
@@ -19,11 +82,12 @@ class ClipboardMonitor:
         """
         self.on_change = on_change
         self.debounce_ms = debounce_ms / 1000.0  # Convert to seconds
-        self._last_content: Optional[str] = None
-        self._last_hash: Optional[str] = None
+        self._last_sig: Optional[tuple[int, bytes]] = None
         self._running = False
         self._thread: Optional[threading.Thread] = None
         self._lock = threading.Lock()
+        self._change_counter: Optional[Callable[[], int]] = None
+        self._last_change_count: Optional[int] = None
         
     def start(self) -> None:
         """Start monitoring clipboard."""
@@ -31,6 +95,8 @@ class ClipboardMonitor:
             return
             
         self._running = True
+        self._change_counter = _create_change_counter()
+        self._last_change_count = None
         self._thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self._thread.start()
         print("Clipboard monitoring started")
@@ -40,37 +106,93 @@ class ClipboardMonitor:
         self._running = False
         if self._thread:
             self._thread.join(timeout=1.0)
+        self._close_change_counter()
         print("Clipboard monitoring stopped")
         
+    def _close_change_counter(self) -> None:
+        """Release the native change counter (XFixes holds an X connection)."""
+        counter, self._change_counter = self._change_counter, None
+        close = getattr(counter, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception:
+                pass
+        
     def _monitor_loop(self) -> None:
         """Main monitoring loop."""
         while self._running:
             try:
-                # Get current clipboard content
-                current_content = pyperclip.paste()
-                
-                if current_content and current_content != self._last_content:
-                    # Calculate hash to avoid duplicate notifications
-                    import hashlib
-                    current_hash = hashlib.sha256(current_content.encode('utf-8')).hexdigest()
-                    
-                    if current_hash != self._last_hash:
-                        self._last_content = current_content
-                        self._last_hash = current_hash
-                        
-                        # Debounce: wait a bit before notifying
-                        time.sleep(self.debounce_ms)
-                        
-                        # Check if content still changed after debounce
-                        if pyperclip.paste() == current_content:
-                            self.on_change(current_content)
-                            
+                self._poll_once()
             except Exception as e:
                 print(f"Error monitoring clipboard: {e}")
                 
             # Check every 100ms
             time.sleep(0.1)
             
+    def _poll_once(self) -> None:
+        """Check the clipboard once and notify on_change if it changed."""
+        # Only read the clipboard (which may spawn xclip/xsel) when the OS
+        # reports a change
+        if not self._has_clipboard_changed():
+            return
+            
+        # Get current clipboard content
+        try:
+            current_content = pyperclip.paste()
+        except Exception:
+            # Forget the count so this change is read again on the next poll
+            self._last_change_count = None
+            raise
+            
+        if not current_content:
+            return
+            
+        # Encode once per sample; compare by signature so the previous
+        # sample can be freed
+        current_sig = _content_signature(current_content.encode('utf-8'))
+        if current_sig != self._last_sig:
+            self._last_sig = current_sig
+            
+            # Debounce: wait a bit before notifying
+            time.sleep(self.debounce_ms)
+            
+            # Check if content still changed after debounce
+            if self._is_unchanged_since_read(current_content):
+                self.on_change(current_content)
+                
+    def _has_clipboard_changed(self) -> bool:
+        """Check the native change counter; assume changed if unavailable."""
+        if self._change_counter is None:
+            return True
+            
+        try:
+            count = self._change_counter()
+        except Exception:
+            # Native source broke (e.g. X connection lost); fall back to polling
+            self._close_change_counter()
+            return True
+            
+        if count == self._last_change_count:
+            return False
+        self._last_change_count = count
+        return True
+        
+    def _is_unchanged_since_read(self, content: str) -> bool:
+        """
+        Check whether the clipboard still holds content read before debouncing.
+        
+        With a native change counter that has not moved this avoids a second
+        clipboard read; the counter is only peeked so a change during debounce
+        is still picked up by the next loop iteration.
+        """
+        # The counter also moves when the same text is copied again or an
+        # owner re-asserts the selection, so only trust it when it is still
+        # unchanged and compare the content otherwise
+        if self._change_counter is not None and self._change_counter() == self._last_change_count:
+            return True
+        return pyperclip.paste() == content
+        
     def get_current_content(self) -> Optional[str]:
         """Get current clipboard content."""
         try:
@@ -85,8 +207,6 @@ class ClipboardMonitor:
         This updates internal state without triggering change callback.
         """
         with self._lock:
-            self._last_content = content
-            import hashlib
-            self._last_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+            self._last_sig = _content_signature(content.encode('utf-8'))
             pyperclip.copy(content)
 
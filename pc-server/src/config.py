@@ -1,7 +1,10 @@
 """Configuration management for PC server."""
 import os
+import socket
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
+import netifaces
 
 # Default configuration
 DEFAULT_PORT = 8765
@@ -25,6 +28,7 @@ AES_TAG_SIZE = 16  # 128 bits
 
 # Network configuration
 REACHABILITY_TIMEOUT = 3  # seconds
+LOCAL_IP_CACHE_TTL = 30  # seconds
 
 # Pre-shared key (for testing without Android key exchange)
 # If set, this key will be used instead of RSA key exchange
@@ -44,30 +48,65 @@ class Config:
         self.rsa_public_key_file: Path = Path(os.getenv("APPCONNECT_RSA_PUBLIC_KEY_FILE", str(RSA_PUBLIC_KEY_FILE)))
         
     def get_local_ip(self) -> Optional[str]:
-        """Get local IP address for primary network interface."""
-        import socket
-        import netifaces
-        
-        try:
-            # Get default gateway interface
-            gateways = netifaces.gateways()
-            default_interface = gateways['default'][netifaces.AF_INET][1]
-            
-            # Get IP address for that interface
-            addresses = netifaces.ifaddresses(default_interface)
-            if netifaces.AF_INET in addresses:
-                ip = addresses[netifaces.AF_INET][0]['addr']
-                return ip
-        except Exception:
-            pass
+        """Get local IP address for primary network interface (cached briefly)."""
+        return get_local_ip_cached()
+
+
+# Last lookup_local_ip() result and its time.monotonic() timestamp, shared
+# by every Config and the mDNS service
+_local_ip_cache: Tuple[Optional[str], float] = (None, 0.0)
+
+
+def get_local_ip_cached() -> Optional[str]:
+    """Return lookup_local_ip(), reusing a successful result for LOCAL_IP_CACHE_TTL seconds."""
+    global _local_ip_cache
+    ip, ts = _local_ip_cache
+    now = time.monotonic()
+    if ip and now - ts < LOCAL_IP_CACHE_TTL:
+        return ip
         
-        # Fallback: try to get IP by connecting to external address
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            ip = s.getsockname()[0]
-            s.close()
-            return ip
-        except Exception:
-            return None
+    ip = lookup_local_ip()
+    if ip:
+        _local_ip_cache = (ip, now)
+    return ip
 
+
+def lookup_local_ip() -> Optional[str]:
+    """
+    Find the local IPv4 address to advertise.
+    
+    Prefers the default-route interface, then any non-loopback interface
+    (so an offline machine with no default route still gets an address),
+    and only then falls back to the UDP-connect probe.
+    """
+    try:
+        # Get default gateway interface
+        gateways = netifaces.gateways()
+        default_interface = gateways['default'][netifaces.AF_INET][1]
+        
+        # Get IP address for that interface
+        addresses = netifaces.ifaddresses(default_interface)
+        if netifaces.AF_INET in addresses:
+            return addresses[netifaces.AF_INET][0]['addr']
+    except Exception:
+        pass
+        
+    # No default route: take the first non-loopback IPv4 address
+    try:
+        for interface in netifaces.interfaces():
+            for entry in netifaces.ifaddresses(interface).get(netifaces.AF_INET, ()):
+                ip = entry.get('addr')
+                if ip and not ip.startswith('127.'):
+                    return ip
+    except Exception:
+        pass
+    
+    # Fallback: try to get IP by connecting to external address
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.connect(("8.8.8.8", 80))
+        ip = s.getsockname()[0]
+        s.close()
+        return ip
+    except Exception:
+        return None
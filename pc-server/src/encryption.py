@@ -1,12 +1,76 @@
 """AES-256-GCM encryption/decryption matching Android implementation."""
-import base64
+import binascii
 import json
-import hashlib
-from typing import Optional
+import logging
+from functools import partial
+from hashlib import sha256 as _sha256
+from os import urandom as _urandom
+from typing import List, Optional, Tuple, Union
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.backends import default_backend
 import secrets
 
+try:
+    # SIMD-accelerated codec (SSSE3/AVX2/NEON)
+    import pybase64
+    _b64encode = pybase64.b64encode
+    _b64decode = pybase64.b64decode
+except ImportError:
+    # Call the C codec directly, skipping the pure-Python base64 wrappers
+    _b64encode = partial(binascii.b2a_base64, newline=False)
+    _b64decode = binascii.a2b_base64
+
+logger = logging.getLogger(__name__)
+
+# hashlib falls back to its built-in (non SHA-NI) implementation when Python
+# was built without OpenSSL
+if not _sha256.__name__.startswith("openssl_"):
+    logger.warning("hashlib is not OpenSSL-backed; SHA-256 will not use hardware acceleration")
+
+def _has_aes_hardware() -> Optional[bool]:
+    """
+    Check /proc/cpuinfo for AES + carry-less multiply support (used by GCM).
+    
+    Returns None when the CPU features cannot be determined.
+    """
+    try:
+        with open("/proc/cpuinfo") as f:
+            cpuinfo = f.read()
+    except OSError:
+        return None
+        
+    for line in cpuinfo.splitlines():
+        # x86 reports "flags", ARM reports "Features"
+        if line.startswith(("flags", "Features")):
+            features = set(line.split(":", 1)[1].split())
+            return "aes" in features and ("pclmulqdq" in features or "pmull" in features)
+    return None
+
+
+# AES-GCM is fixed by the Android protocol, so this can only be reported
+if _has_aes_hardware() is False:
+    logger.warning("CPU lacks AES/CLMUL instructions; AES-GCM will run in software")
+
+# Number of IVs drawn from the OS RNG in a single getrandom() call
+IV_POOL_SIZE = 256
+
+# A 12-byte IV is a multiple of 3 bytes, so it encodes to exactly 16 base64
+# chars with no padding; base64(iv || ct) == base64(iv) + base64(ct)
+_IV_B64_LEN = 16
+
+
+# Padding needed to restore stripped base64, indexed by len(data) & 3
+_B64_PAD = (b'', b'===', b'==', b'=')
+
+
+def _b64decode_unpadded(data: memoryview) -> bytes:
+    """Decode base64 that may have had its 0-2 padding chars stripped."""
+    pad = _B64_PAD[len(data) & 3]
+    if pad:
+        # Only input with stripped padding needs a copy
+        return _b64decode(bytes(data) + pad)
+    return _b64decode(data)
+
 
 class EncryptionManager:
     """Manages AES-256-GCM encryption matching Android EncryptionManager."""
@@ -20,6 +84,8 @@ class EncryptionManager:
         """
         self._key: Optional[bytes] = key
         self._aesgcm: Optional[AESGCM] = None
+        self._iv_pool: bytes = b''
+        self._iv_off: int = 0
         if key:
             self._aesgcm = AESGCM(key)
             
@@ -27,6 +93,8 @@ class EncryptionManager:
         """Set the AES encryption key."""
         if len(key) != 32:
             raise ValueError("AES key must be 32 bytes (256 bits)")
+        if self._aesgcm is not None and key == self._key:
+            return
         self._key = key
         self._aesgcm = AESGCM(key)
         
@@ -36,6 +104,15 @@ class EncryptionManager:
         self.set_key(key)
         return key
         
+    def _next_iv(self) -> bytes:
+        """Take the next random 12-byte IV, refilling the pool when exhausted."""
+        if self._iv_off + 12 > len(self._iv_pool):
+            self._iv_pool = _urandom(12 * IV_POOL_SIZE)
+            self._iv_off = 0
+        iv = self._iv_pool[self._iv_off:self._iv_off + 12]
+        self._iv_off += 12
+        return iv
+        
     def encrypt(self, data: str) -> tuple[bytes, bytes]:
         """
         Encrypt data using AES-256-GCM.
@@ -48,17 +125,68 @@ class EncryptionManager:
             - iv: 12-byte initialization vector
             - encrypted_bytes: Encrypted data with 16-byte GCM tag appended
         """
+        return self.encrypt_bytes(data.encode())
+        
+    def encrypt_bytes(self, data: bytes) -> tuple[bytes, bytes]:
+        """
+        Encrypt already-encoded data using AES-256-GCM.
+        
+        Same as encrypt() but skips the UTF-8 encoding step.
+        """
         if not self._aesgcm:
             raise ValueError("Encryption key not set")
             
-        # Generate random 12-byte IV
-        iv = secrets.token_bytes(12)
+        # Random 12-byte IV (taken from a pre-filled pool)
+        iv = self._next_iv()
         
         # Encrypt data (GCM automatically appends 16-byte tag)
-        encrypted = self._aesgcm.encrypt(iv, data.encode('utf-8'), None)
+        encrypted = self._aesgcm.encrypt(iv, data, None)
         
         return iv, encrypted
         
+    def encrypt_packed(self, data: bytes) -> bytes:
+        """
+        Encrypt data and return a single buffer: 12-byte IV || ciphertext+tag.
+        """
+        iv, encrypted = self.encrypt_bytes(data)
+        return iv + encrypted
+        
+    def decrypt_packed(self, packed: bytes) -> bytes:
+        """Decrypt a buffer produced by encrypt_packed()."""
+        view = memoryview(packed)
+        return self.decrypt_bytes(view[:12], view[12:])
+        
+    def encrypt_many(self, data: List[str]) -> List[Tuple[bytes, bytes]]:
+        """
+        Encrypt several strings in one call.
+        
+        All IVs come from a single RNG read and the per-message loop avoids
+        repeated method dispatch.
+        
+        Returns:
+            List of (iv, encrypted_bytes) tuples, in input order
+        """
+        if not self._aesgcm:
+            raise ValueError("Encryption key not set")
+            
+        iv_pool = _urandom(12 * len(data))
+        aes_encrypt = self._aesgcm.encrypt
+        encode = str.encode  # UTF-8 by default
+        results = []
+        for i, item in enumerate(data):
+            iv = iv_pool[i * 12:(i + 1) * 12]
+            results.append((iv, aes_encrypt(iv, encode(item), None)))
+        return results
+        
+    def decrypt_many(self, items: List[Tuple[bytes, bytes]]) -> List[str]:
+        """Decrypt several (iv, encrypted_bytes) tuples in one call."""
+        if not self._aesgcm:
+            raise ValueError("Encryption key not set")
+            
+        aes_decrypt = self._aesgcm.decrypt
+        decode = bytes.decode  # UTF-8 by default
+        return [decode(aes_decrypt(iv, encrypted, None)) for iv, encrypted in items]
+        
     def decrypt(self, iv: bytes, encrypted: bytes) -> str:
         """
         Decrypt data using AES-256-GCM.
@@ -70,45 +198,72 @@ class EncryptionManager:
         Returns:
             Decrypted plaintext string
         """
+        return self.decrypt_bytes(iv, encrypted).decode()
+        
+    def decrypt_bytes(self, iv: bytes, encrypted: bytes) -> bytes:
+        """
+        Decrypt data using AES-256-GCM without decoding the plaintext.
+        
+        Same as decrypt() but returns the raw UTF-8 bytes.
+        """
         if not self._aesgcm:
             raise ValueError("Encryption key not set")
             
         # Decrypt (GCM automatically verifies 16-byte tag)
-        decrypted = self._aesgcm.decrypt(iv, encrypted, None)
-        
-        return decrypted.decode('utf-8')
+        return self._aesgcm.decrypt(iv, encrypted, None)
         
-    def encrypt_for_transmission(self, data: str) -> str:
+    def encrypt_for_transmission(self, data: Union[str, bytes]) -> str:
         """
         Encrypt and format for transmission: {ivBase64}|{encryptedBase64}
         
         Uses NO_WRAP base64 encoding (no padding, no line breaks) to match Android.
+        Accepts either text or already UTF-8 encoded bytes.
         """
-        iv, encrypted = self.encrypt(data)
+        return self.encrypt_for_transmission_bytes(data).decode('ascii')
         
-        # Base64 encode with NO_WRAP (no padding, no line breaks)
-        iv_b64 = base64.b64encode(iv).decode('ascii').rstrip('=')
-        encrypted_b64 = base64.b64encode(encrypted).decode('ascii').rstrip('=')
+    def encrypt_for_transmission_bytes(self, data: Union[str, bytes]) -> bytes:
+        """
+        Same as encrypt_for_transmission() but returns the ASCII message as bytes.
+        
+        For transports that write bytes, this skips a decode/re-encode round trip.
+        """
+        if isinstance(data, str):
+            data = data.encode()
+            
+        # Base64 encode IV||ciphertext in one pass with NO_WRAP (no padding,
+        # no line breaks), then split at the IV boundary for Android's format
+        packed_b64 = memoryview(_b64encode(self.encrypt_packed(data)).rstrip(b'='))
         
-        return f"{iv_b64}|{encrypted_b64}"
+        # join() over memoryview slices builds the output in one allocation
+        return b'|'.join((packed_b64[:_IV_B64_LEN], packed_b64[_IV_B64_LEN:]))
         
-    def decrypt_from_transmission(self, message: str) -> str:
+    def decrypt_from_transmission(self, message: Union[str, bytes]) -> str:
         """
         Decrypt message in format: {ivBase64}|{encryptedBase64}
         
         Handles NO_WRAP base64 encoding from Android.
         """
-        parts = message.split("|")
-        if len(parts) != 2:
+        return self.decrypt_bytes_from_transmission(message).decode()
+        
+    def decrypt_bytes_from_transmission(self, message: Union[str, bytes]) -> bytes:
+        """
+        Decrypt transmission message, returning the raw UTF-8 plaintext bytes.
+        
+        Useful when the consumer (e.g. json.loads) accepts bytes directly.
+        """
+        data = message.encode('ascii') if isinstance(message, str) else message
+        # Exactly one separator with non-empty halves; the two finds together
+        # scan the message once
+        sep = data.find(b'|')
+        if sep <= 0 or sep == len(data) - 1 or data.find(b'|', sep + 1) >= 0:
             raise ValueError("Invalid message format: expected {ivBase64}|{encryptedBase64}")
             
-        iv_b64, encrypted_b64 = parts
-        
-        # Base64 decode (add padding if needed)
-        iv = base64.b64decode(iv_b64 + '=' * (4 - len(iv_b64) % 4))
-        encrypted = base64.b64decode(encrypted_b64 + '=' * (4 - len(encrypted_b64) % 4))
+        # Slice both halves without copying the (potentially large) ciphertext
+        view = memoryview(data)
+        iv = _b64decode_unpadded(view[:sep])
+        encrypted = _b64decode_unpadded(view[sep + 1:])
         
-        return self.decrypt(iv, encrypted)
+        return self.decrypt_bytes(iv, encrypted)
         
     @staticmethod
     def calculate_hash(content: str) -> str:
@@ -117,6 +272,5 @@ class EncryptionManager:
         
         Matches Android ClipboardSyncService.calculateHash() which uses %02x (lowercase).
         """
-        digest = hashlib.sha256(content.encode('utf-8')).digest()
-        return digest.hex()  # lowercase hex
+        return _sha256(content.encode()).hexdigest()  # lowercase hex
 
@@ -1,10 +1,12 @@
 """mDNS service broadcasting for device discovery."""
 from zeroconf import ServiceInfo
 from zeroconf.asyncio import AsyncZeroconf
-from typing import Optional
+from typing import Dict, Optional, Tuple
 import socket
 import asyncio
 
+from .config import get_local_ip_cached
+
 
 class MDNSService:
     """Manages mDNS service broadcasting."""
@@ -16,6 +18,11 @@ class MDNSService:
         self.zeroconf: Optional[AsyncZeroconf] = None
         self.service_info: Optional[ServiceInfo] = None
         self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+        # ServiceInfo fields pre-encoded once so re-registrations (IP
+        # changes, resume from suspend) skip zeroconf's str->bytes pass
+        self._properties: Dict[bytes, bytes] = {b"app_id": app_id.encode("ascii")}
+        self._server_cached: Optional[Tuple[str, str]] = None
+        self._packed_addr: Optional[Tuple[str, bytes]] = None
             
     async def start_async(self, name: str, port: int, ip: Optional[str] = None) -> None:
         """Start broadcasting mDNS service (async)."""
@@ -39,13 +46,17 @@ class MDNSService:
         # Create service info
         # Service name format: {instance}.{service_type}.local.
         service_name = f"{name}.{self.service_type}.local."
+        if self._server_cached is None or self._server_cached[0] != name:
+            self._server_cached = (name, f"{name}.local.")
+        if self._packed_addr is None or self._packed_addr[0] != ip:
+            self._packed_addr = (ip, socket.inet_aton(ip))
         self.service_info = ServiceInfo(
             type_=f"{self.service_type}.local.",
             name=service_name,
-            addresses=[socket.inet_aton(ip)],
+            addresses=[self._packed_addr[1]],
             port=port,
-            properties={"app_id": self.app_id},
-            server=f"{name}.local."
+            properties=self._properties,
+            server=self._server_cached[1]
         )
         
         # Register service asynchronously
@@ -79,13 +90,6 @@ class MDNSService:
             print("mDNS service stopped")
             
     def _get_local_ip(self) -> Optional[str]:
-        """Get local IP address."""
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            ip = s.getsockname()[0]
-            s.close()
-            return ip
-        except Exception:
-            return None
+        """Get local IP address (cached briefly, shared with Config)."""
+        return get_local_ip_cached()
 
@@ -1,13 +1,31 @@
 """Message parsing for ClipboardItem JSON format."""
 import json
+import time
 import uuid
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Union
+
+try:
+    import orjson
+    
+    def json_dumps(obj: Any) -> str:
+        """Serialize to compact JSON (orjson emits no whitespace by default)."""
+        return orjson.dumps(obj).decode()
+        
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj: Any) -> str:
+        """Serialize to compact JSON."""
+        return json.dumps(obj, separators=(',', ':'))
+        
+    json_loads = json.loads
 
 
 class ClipboardItem:
     """Represents a clipboard item matching Android ClipboardItem model."""
     
+    __slots__ = ('id', 'content', 'contentType', 'timestamp', 'ttl',
+                 'synced', 'sourceDeviceId', 'hash')
+    
     def __init__(self, id: str, content: str, contentType: str, 
                  timestamp: int, ttl: int, synced: bool,
                  sourceDeviceId: Optional[str], hash: str):
@@ -65,10 +83,10 @@ class ClipboardItem:
         ttl_ms = 24 * 60 * 60 * 1000
         
         return cls(
-            id=str(uuid.uuid4()),
+            id=uuid.uuid4().hex,
             content=content,
             contentType="TEXT",
-            timestamp=int(datetime.utcnow().timestamp() * 1000),
+            timestamp=time.time_ns() // 1_000_000,
             ttl=ttl_ms,
             synced=False,
             sourceDeviceId=source_device_id,
@@ -77,11 +95,21 @@ class ClipboardItem:
         
     def to_json(self) -> str:
         """Serialize to JSON string."""
-        return json.dumps(self.to_dict(), separators=(',', ':'))
+        # Inline literal rather than to_dict() to skip a method call
+        return json_dumps({
+            "id": self.id,
+            "content": self.content,
+            "contentType": self.contentType,
+            "timestamp": self.timestamp,
+            "ttl": self.ttl,
+            "synced": self.synced,
+            "sourceDeviceId": self.sourceDeviceId,
+            "hash": self.hash
+        })
         
     @classmethod
-    def from_json(cls, json_str: str) -> 'ClipboardItem':
-        """Deserialize from JSON string."""
-        data = json.loads(json_str)
+    def from_json(cls, json_str: Union[str, bytes]) -> 'ClipboardItem':
+        """Deserialize from JSON string (or UTF-8 encoded bytes)."""
+        data = json_loads(json_str)
         return cls.from_dict(data)
 
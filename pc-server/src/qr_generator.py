@@ -1,11 +1,18 @@
 """QR code generation with connection info."""
-import json
-import base64
-import qrcode
 from pathlib import Path
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
-from typing import Optional
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+
+from .message_parser import json_dumps
+
+if TYPE_CHECKING:
+    import qrcode
+
+# Process-wide cache of Base64 public keys, keyed by (path, mtime_ns) so a
+# rotated key file is picked up automatically
+_PUBLIC_KEY_B64_CACHE: Dict[Tuple[Path, int], str] = {}
+
+# Terminal rendering of a QR module, indexed by the (bool) matrix cell
+_LUT = ('  ', '██')
 
 
 class QRCodeGenerator:
@@ -18,6 +25,11 @@ class QRCodeGenerator:
         self.port = port
         self.cert_fingerprint = cert_fingerprint
         self.rsa_public_key_file = rsa_public_key_file
+        self._public_key_b64: Optional[str] = None
+        self._connection_info_json: Optional[str] = None
+        self._qr: Optional["qrcode.QRCode"] = None
+        self._qr_img = None
+        self._ascii_qr: Optional[str] = None
         
     def ensure_rsa_key_exists(self) -> None:
         """Generate RSA key pair if it doesn't exist."""
@@ -26,6 +38,10 @@ class QRCodeGenerator:
             
     def _generate_rsa_key_pair(self) -> None:
         """Generate RSA key pair for key exchange."""
+        # Only needed on first run, so imported here rather than at startup
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        
         # Generate private key
         private_key = rsa.generate_private_key(
             public_exponent=65537,
@@ -51,18 +67,36 @@ class QRCodeGenerator:
                 format=serialization.PublicFormat.SubjectPublicKeyInfo
             ))
             
+        # Drop anything cached from the previous key
+        self._public_key_b64 = None
+        self._connection_info_json = None
+        self._qr = None
+        self._qr_img = None
+        self._ascii_qr = None
         print(f"Generated RSA key pair: {self.rsa_public_key_file}")
         
     def get_public_key_base64(self) -> str:
-        """Get RSA public key as Base64 string for QR code."""
+        """Get RSA public key as Base64 string for QR code (read once and cached)."""
+        if self._public_key_b64 is not None:
+            return self._public_key_b64
+            
         if not self.rsa_public_key_file.exists():
             self._generate_rsa_key_pair()
             
-        with open(self.rsa_public_key_file, "rb") as f:
-            public_key_pem = f.read()
+        cache_key = (self.rsa_public_key_file, self.rsa_public_key_file.stat().st_mtime_ns)
+        public_key_b64 = _PUBLIC_KEY_B64_CACHE.get(cache_key)
+        if public_key_b64 is None:
+            with open(self.rsa_public_key_file, "r", encoding="ascii") as f:
+                public_key_pem = f.read()
+                
+            # PEM body is already Base64 of the DER key: slice between the
+            # header and footer lines and drop the line breaks
+            start = public_key_pem.find('\n') + 1
+            end = public_key_pem.rfind('-----END')
+            public_key_b64 = public_key_pem[start:end].replace('\n', '')
+            _PUBLIC_KEY_B64_CACHE[cache_key] = public_key_b64
             
-        # Convert PEM to Base64 (remove headers and newlines)
-        public_key_b64 = base64.b64encode(public_key_pem).decode('ascii')
+        self._public_key_b64 = public_key_b64
         return public_key_b64
         
     def generate_connection_info_json(self) -> str:
@@ -70,7 +104,12 @@ class QRCodeGenerator:
         Generate JSON connection info matching QrConnectionInfo format.
         
         Format: {"n": name, "ip": ip, "p": port, "k": publicKey, "fp": certFingerprint}
+        
+        The inputs are fixed for the server's lifetime, so the JSON is built once.
         """
+        if self._connection_info_json is not None:
+            return self._connection_info_json
+            
         public_key_b64 = self.get_public_key_base64()
         
         connection_info = {
@@ -82,7 +121,8 @@ class QRCodeGenerator:
         }
         
         # Compact JSON (no spaces) to minimize QR code size
-        return json.dumps(connection_info, separators=(',', ':'))
+        self._connection_info_json = json_dumps(connection_info)
+        return self._connection_info_json
         
     def generate_qr_code(self, output_file: Optional[Path] = None) -> str:
         """
@@ -95,25 +135,15 @@ class QRCodeGenerator:
             Connection info JSON string
         """
         connection_info_json = self.generate_connection_info_json()
-        
-        # Create QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=2,
-            border=2,
-        )
-        qr.add_data(connection_info_json)
-        qr.make(fit=True)
-        
-        # Create image
-        img = qr.make_image(fill_color="black", back_color="white")
+        qr, img = self._create_qr_image(connection_info_json)
         
         # Always save to default location if not specified
         if output_file is None:
             output_file = self.rsa_public_key_file.parent / "qr_code.png"
         
-        img.save(output_file)
+        # Low zlib level: the image is tiny and monochrome, so level 6 plus
+        # PIL's optimize pass only burns CPU for a few saved bytes
+        img.save(output_file, compress_level=1, optimize=False)
         print(f"\nQR code saved to: {output_file}")
         print(f"You can open this image file to scan with your Android app!\n")
         
@@ -122,23 +152,52 @@ class QRCodeGenerator:
             
         return connection_info_json
         
-    def _print_qr_ascii(self, qr: qrcode.QRCode) -> None:
+    def _create_qr_image(self, connection_info_json: str):
+        """
+        Build the QR code and its image, reusing them on later calls.
+        
+        Returns:
+            Tuple of (qrcode.QRCode, image)
+        """
+        if self._qr is not None:
+            return self._qr, self._qr_img
+            
+        import qrcode
+        
+        # Create QR code. A fixed mask skips best_mask_pattern(), which scores
+        # all 8 masks and dominates generation time; mask quality does not
+        # matter for a short-range scan by our own app.
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=2,
+            border=2,
+            mask_pattern=0,
+        )
+        qr.add_data(connection_info_json)
+        qr.make(fit=True)
+        
+        # Create image
+        self._qr_img = qr.make_image(fill_color="black", back_color="white")
+        self._qr = qr
+        return self._qr, self._qr_img
+        
+    def _print_qr_ascii(self, qr: "qrcode.QRCode") -> None:
         """Print QR code as ASCII art in terminal."""
         print("\n" + "=" * 50)
         print("Scan this QR code with your Android app:")
         print("=" * 50)
         
-        # Get matrix
-        matrix = qr.get_matrix()
-        
-        # Print with borders
-        print("┌" + "─" * (len(matrix[0]) + 2) + "┐")
-        for row in matrix:
-            print("│ ", end="")
-            for cell in row:
-                print("██" if cell else "  ", end="")
-            print(" │")
-        print("└" + "─" * (len(matrix[0]) + 2) + "┘")
+        # Render once and write with a single print call
+        if self._ascii_qr is None:
+            matrix = qr.get_matrix()
+            width = len(matrix[0]) * 2 + 2  # 2 chars per module + padding
+            lines = ["┌" + "─" * width + "┐"]
+            for row in matrix:
+                lines.append(f"│ {''.join(map(_LUT.__getitem__, row))} │")
+            lines.append("└" + "─" * width + "┘")
+            self._ascii_qr = "\n".join(lines)
+        print(self._ascii_qr)
         
         print("\nConnection Info:")
         print(f"  Device: {self.device_name}")
@@ -14,6 +14,12 @@ from .clipboard_monitor import ClipboardMonitor
 from .clipboard_writer import ClipboardWriter
 from typing import Optional
 
+try:
+    # Faster drop-in event loop for the TLS/socket hot path (POSIX only)
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -34,6 +40,8 @@ class AppConnectServer:
         self.clipboard_monitor: Optional[ClipboardMonitor] = None
         self.running = False
         self._main_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._broadcast_queue: Optional[asyncio.Queue] = None
+        self._broadcast_task: Optional[asyncio.Task] = None
         
     def initialize(self) -> None:
         """Initialize all server components."""
@@ -112,7 +120,7 @@ class AppConnectServer:
         
     def _on_clipboard_received(self, content: str) -> None:
         """Callback when clipboard is received from Android."""
-        logger.info(f"Clipboard received from Android: {content[:50]}...")
+        logger.info("Clipboard received from Android: %.50s...", content)
         # Update monitor to prevent loop
         if self.clipboard_monitor:
             self.clipboard_monitor.set_content(content)
@@ -122,36 +130,35 @@ class AppConnectServer:
         if not self.websocket_server:
             return
             
-        logger.info(f"Local clipboard changed: {content[:50]}...")
+        logger.info("Local clipboard changed: %.50s...", content)
         
-        # Schedule broadcast on the main event loop
-        # This callback runs in a separate thread, so we need to schedule
-        # the coroutine on the main event loop
+        # This callback runs on the monitor thread; hand the broadcast to the
+        # loop stored in start() with a single thread-safe callback
+        loop = self._main_loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(self._enqueue_broadcast, content)
+        else:
+            logger.warning("Event loop not running, dropping clipboard broadcast")
+            
+    def _enqueue_broadcast(self, content: str) -> None:
+        """Queue a local clipboard change for broadcast (runs on the event loop)."""
         try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                asyncio.run_coroutine_threadsafe(
-                    self.websocket_server.broadcast_clipboard(content),
-                    loop
-                )
-            else:
-                # If loop is not running, create a task
-                asyncio.create_task(
-                    self.websocket_server.broadcast_clipboard(content)
-                )
-        except RuntimeError:
-            # No event loop in this thread, try to get the main loop
+            self._broadcast_queue.put_nowait(content)
+        except asyncio.QueueFull:
+            # Broadcasts are falling behind; the oldest change is already stale
+            self._broadcast_queue.get_nowait()
+            self._broadcast_queue.put_nowait(content)
+            
+    async def _broadcast_loop(self) -> None:
+        """Broadcast queued local clipboard changes, one at a time."""
+        while True:
+            content = await self._broadcast_queue.get()
             try:
-                # Get the loop from the websocket server's context
-                # We'll need to store a reference to the loop
-                if hasattr(self, '_main_loop') and self._main_loop:
-                    asyncio.run_coroutine_threadsafe(
-                        self.websocket_server.broadcast_clipboard(content),
-                        self._main_loop
-                    )
+                await self.websocket_server.broadcast_clipboard(content)
             except Exception as e:
-                logger.error(f"Failed to schedule clipboard broadcast: {e}")
-        
+                logger.error(f"Clipboard broadcast failed: {e}", exc_info=True)
+                
+
     async def start(self) -> None:
         """Start all server services."""
         if self.running:
@@ -162,6 +169,8 @@ class AppConnectServer:
         
         # Store reference to main event loop for clipboard monitor callbacks
         self._main_loop = asyncio.get_running_loop()
+        self._broadcast_queue = asyncio.Queue(maxsize=16)
+        self._broadcast_task = asyncio.create_task(self._broadcast_loop())
         
         # Start mDNS broadcasting (async)
         local_ip = self.config.get_local_ip()
@@ -175,6 +184,10 @@ class AppConnectServer:
         # Start clipboard monitoring
         self.clipboard_monitor.start()
         
+        # stop_async() may have run while mDNS was starting
+        if not self.running:
+            return
+            
         # Start WebSocket server (this blocks)
         try:
             await self.websocket_server.start(
@@ -197,6 +210,15 @@ class AppConnectServer:
         if self.clipboard_monitor:
             self.clipboard_monitor.stop()
             
+        if self._broadcast_task:
+            self._broadcast_task.cancel()
+            self._broadcast_task = None
+            
+        # Only while serving: a stop() after start() returned would be kept
+        # as a pending request and end the next start() immediately
+        if self.websocket_server and self.websocket_server.is_serving():
+            self.websocket_server.stop()
+            
         # Stop mDNS (async)
         if self.mdns_service:
             await self.mdns_service.stop_async()
@@ -232,7 +254,10 @@ class AppConnectServer:
         
         # Run server with proper cleanup
         try:
-            asyncio.run(self._run_async())
+            if uvloop is not None:
+                uvloop.run(self._run_async())
+            else:
+                asyncio.run(self._run_async())
         except KeyboardInterrupt:
             logger.info("Keyboard interrupt received")
         except Exception as e:
@@ -249,6 +274,15 @@ class AppConnectServer:
     
     async def _run_async(self) -> None:
         """Run the server asynchronously."""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                # Ends websocket_server.start() so the finally below cleans up
+                loop.add_signal_handler(sig, self.websocket_server.stop)
+            except (NotImplementedError, RuntimeError):
+                # Windows event loops have no signal handler support; Ctrl+C
+                # still arrives as KeyboardInterrupt in run()
+                pass
         try:
             await self.start()
         except asyncio.CancelledError:
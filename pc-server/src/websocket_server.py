@@ -1,30 +1,71 @@
 """WebSocket server with key exchange and message handling."""
 import asyncio
-import json
-import base64
+import binascii
 import logging
+import queue
+import secrets
+import threading
+import time
 from pathlib import Path
-from typing import Optional, Dict, Callable
+from typing import Optional, Dict, Callable, Union
+from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.primitives import hashes
-import websockets
-from websockets.server import WebSocketServerProtocol
+from cryptography.exceptions import InvalidTag
+from websockets.asyncio.server import ServerConnection, serve
 from websockets.exceptions import ConnectionClosed
 
 from .encryption import EncryptionManager
-from .message_parser import ClipboardItem
+from .message_parser import ClipboardItem, json_dumps, json_loads
 from .clipboard_writer import ClipboardWriter
 
 logger = logging.getLogger(__name__)
 
+# Outgoing frames buffered per client; a slow client drops its oldest
+# (stale) clipboard updates instead of stalling broadcasts to the others
+SEND_QUEUE_SIZE = 64
+
+# Prefix of a binary key exchange frame (followed by the RSA-OAEP ciphertext)
+KEY_EXCHANGE_MAGIC = b"KXCH"
+
+# The success ack never changes, so serialize it once
+_KEY_EXCHANGE_ACK_OK = json_dumps({"type": "key_exchange_ack", "status": "ok"})
+
+# Received clipboard updates are coalesced for this long before writing, so
+# a burst from the phone costs one OS clipboard write instead of many
+CLIPBOARD_WRITE_DELAY = 0.05  # seconds
+
+# Incoming frames larger than this are decrypted in the executor
+DECRYPT_OFFLOAD_THRESHOLD = 8192  # bytes
+
+
+def _b64d(s: str) -> bytes:
+    """Decode Base64 whose padding may be stripped (e.g. Android NO_PADDING)."""
+    return binascii.a2b_base64(s + '=' * (-len(s) % 4))
+
+
+class _ConnectionState:
+    """Per-connection state (slots keep it small and attribute reads cheap)."""
+    
+    __slots__ = ('encryption', 'key_exchanged', 'address', 'queue', 'loop', 'binary')
+    
+    def __init__(self, address, loop: asyncio.AbstractEventLoop):
+        self.encryption: Optional[EncryptionManager] = None
+        self.key_exchanged = False
+        self.address = address
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.loop = loop
+        self.binary = False  # Client sends raw IV||ciphertext binary frames
+
 
 class WebSocketServer:
     """Secure WebSocket server for clipboard synchronization."""
     
     def __init__(self, ssl_context, rsa_private_key_file: Path, 
                  device_id: str, on_clipboard_received: Optional[Callable[[str], None]] = None,
-                 pre_shared_key: Optional[bytes] = None):
+                 pre_shared_key: Optional[bytes] = None,
+                 compression: Optional[str] = None):
         """
         Initialize WebSocket server.
         
@@ -34,20 +75,64 @@ class WebSocketServer:
             device_id: Device identifier for sourceDeviceId
             on_clipboard_received: Optional callback when clipboard is received from Android
             pre_shared_key: Optional pre-shared AES key (for testing without key exchange)
+            compression: WebSocket compression extension ("deflate" or None).
+                Off by default: frames are AES-GCM ciphertext, which does not
+                compress, so deflate would only cost CPU
         """
         self.ssl_context = ssl_context
         self.rsa_private_key_file = rsa_private_key_file
         self.device_id = device_id
         self.on_clipboard_received = on_clipboard_received
         self.pre_shared_key = pre_shared_key
+        self.compression = compression
+        # With a pre-shared key every connection uses the same key, so one
+        # manager serves them all and broadcasts can encrypt once
+        self._psk_encryption: Optional[EncryptionManager] = (
+            EncryptionManager(pre_shared_key) if pre_shared_key else None
+        )
         
         # Per-connection state
-        self.connections: Dict[WebSocketServerProtocol, Dict] = {}
+        self.connections: Dict[ServerConnection, _ConnectionState] = {}
+        # State of connections that finished the key exchange (broadcast
+        # targets), so broadcasts read it without a per-client lookup
+        self._ready: Dict[ServerConnection, _ConnectionState] = {}
+        
+        # Latest received clipboard not yet written, and the task writing it
+        self._pending_write: Optional[str] = None
+        self._write_task: Optional[asyncio.Task] = None
         
-        # Load RSA private key (only if not using pre-shared key)
+        # Set by stop() to make start() return; the flag also covers a stop()
+        # that arrives before start() has created the event
+        self._stop_requested = False
+        self._stop_event: Optional[asyncio.Event] = None
+        
+        # on_clipboard_received runs on one worker thread, in order, while
+        # start() is serving; None on the queue tells the worker to exit
+        self._callback_queue: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._callback_thread: Optional[threading.Thread] = None
+        
+        # RSA private key is loaded on the first key exchange (never, when
+        # a pre-shared key is used)
         self._rsa_private_key = None
+        self._oaep_padding: Optional[padding.OAEP] = None
         if not pre_shared_key:
-            self._load_rsa_key()
+            # Reused for every key exchange
+            self._oaep_padding = padding.OAEP(
+                mgf=padding.MGF1(algorithm=hashes.SHA256()),
+                algorithm=hashes.SHA256(),
+                label=None
+            )
+            
+        # AESGCM runs on cryptography's bundled OpenSSL (EVP, so AES-NI and
+        # CLMUL are used when present). One throwaway encrypt front-loads
+        # OpenSSL's lazy init so the first real message doesn't pay for it;
+        # its timing makes a lost hardware path visible in the log.
+        warmup = self._psk_encryption or EncryptionManager(secrets.token_bytes(32))
+        start = time.perf_counter()
+        warmup.encrypt_for_transmission("warmup")
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        logger.info(f"AES-GCM backend: {default_backend().openssl_version_text()} "
+                    f"(warm-up encrypt {elapsed_us:.0f} us)")
         
     def _load_rsa_key(self) -> None:
         """Load RSA private key for key exchange."""
@@ -61,45 +146,57 @@ class WebSocketServer:
             logger.error(f"Failed to load RSA private key: {e}")
             raise
             
-    async def handle_client(self, websocket: WebSocketServerProtocol, path: str) -> None:
+    def _rsa_decrypt(self, encrypted_key: bytes) -> bytes:
+        """Unwrap the client's AES key with RSA-OAEP (runs in an executor)."""
+        return self._rsa_private_key.decrypt(encrypted_key, self._oaep_padding)
+            
+    async def handle_client(self, websocket: ServerConnection) -> None:
         """Handle a WebSocket client connection."""
         remote_addr = websocket.remote_address
-        logger.info(f"WebSocket client connected: {remote_addr}")
+        logger.info("WebSocket client connected: %s", remote_addr)
         
         # Initialize connection state
-        connection_state = {
-            "encryption": None,  # EncryptionManager instance
-            "key_exchanged": False,
-            "address": remote_addr
-        }
+        connection_state = _ConnectionState(remote_addr, asyncio.get_running_loop())
         self.connections[websocket] = connection_state
+        sender = asyncio.create_task(self._sender_loop(websocket, connection_state.queue))
         
         try:
             # Wait for key exchange message
             await self._handle_key_exchange(websocket, connection_state)
+            self._ready[websocket] = connection_state
             
             # Handle messages
             async for message in websocket:
                 await self._handle_message(websocket, message, connection_state)
                 
         except ConnectionClosed:
-            logger.info(f"WebSocket client disconnected: {remote_addr}")
+            logger.info("WebSocket client disconnected: %s", remote_addr)
         except Exception as e:
             logger.error(f"Error handling client {remote_addr}: {e}", exc_info=True)
         finally:
             # Cleanup
-            if websocket in self.connections:
-                del self.connections[websocket]
+            sender.cancel()
+            self._ready.pop(websocket, None)
+            self.connections.pop(websocket, None)
                 
-    async def _handle_key_exchange(self, websocket: WebSocketServerProtocol, 
-                                   connection_state: Dict) -> None:
+    async def _sender_loop(self, websocket: ServerConnection, 
+                           send_queue: asyncio.Queue) -> None:
+        """Write queued frames to one client, in order."""
+        try:
+            while True:
+                message = await send_queue.get()
+                await websocket.send(message)
+        except ConnectionClosed:
+            pass
+                
+    async def _handle_key_exchange(self, websocket: ServerConnection, 
+                                   connection_state: _ConnectionState) -> None:
         """Handle RSA-based key exchange or use pre-shared key."""
         # If pre-shared key is set, use it directly
         if self.pre_shared_key:
-            encryption = EncryptionManager(self.pre_shared_key)
-            connection_state["encryption"] = encryption
-            connection_state["key_exchanged"] = True
-            logger.info(f"Using pre-shared key for {connection_state['address']}")
+            connection_state.encryption = self._psk_encryption
+            connection_state.key_exchanged = True
+            logger.info("Using pre-shared key for %s", connection_state.address)
             return
             
         # Otherwise, perform RSA key exchange
@@ -107,115 +204,188 @@ class WebSocketServer:
             # Wait for encrypted AES key from client
             message = await asyncio.wait_for(websocket.recv(), timeout=10.0)
             
-            # Parse key exchange message
-            # Format: {"type": "key_exchange", "encrypted_key": "base64_encrypted_aes_key"}
-            key_exchange_data = json.loads(message)
-            
-            if key_exchange_data.get("type") != "key_exchange":
-                raise ValueError("Expected key exchange message")
+            if isinstance(message, bytes) and message[:4] == KEY_EXCHANGE_MAGIC:
+                # Binary frame: b"KXCH" + raw RSA-OAEP ciphertext
+                encrypted_key = message[4:]
+            else:
+                # Parse key exchange message
+                # Format: {"type": "key_exchange", "encrypted_key": "base64_encrypted_aes_key"}
+                key_exchange_data = json_loads(message)
                 
-            encrypted_key_b64 = key_exchange_data.get("encrypted_key")
-            if not encrypted_key_b64:
-                raise ValueError("Missing encrypted_key in key exchange")
+                if key_exchange_data.get("type") != "key_exchange":
+                    raise ValueError("Expected key exchange message")
+                    
+                encrypted_key_b64 = key_exchange_data.get("encrypted_key")
+                if not encrypted_key_b64:
+                    raise ValueError("Missing encrypted_key in key exchange")
+                    
+                # Decode AES key
+                encrypted_key = _b64d(encrypted_key_b64)
                 
-            # Decode and decrypt AES key
-            encrypted_key = base64.b64decode(encrypted_key_b64)
-            aes_key = self._rsa_private_key.decrypt(
-                encrypted_key,
-                padding.OAEP(
-                    mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                    algorithm=hashes.SHA256(),
-                    label=None
-                )
-            )
+            # PEM parsing and RSA decryption are pure CPU; keep them off the
+            # event loop
+            loop = asyncio.get_running_loop()
+            if self._rsa_private_key is None:
+                await loop.run_in_executor(None, self._load_rsa_key)
+            aes_key = await loop.run_in_executor(None, self._rsa_decrypt, encrypted_key)
             
             # Initialize encryption manager with shared key
             encryption = EncryptionManager(aes_key)
-            connection_state["encryption"] = encryption
-            connection_state["key_exchanged"] = True
+            connection_state.encryption = encryption
+            connection_state.key_exchanged = True
             
             # Send confirmation
-            await websocket.send(json.dumps({"type": "key_exchange_ack", "status": "ok"}))
+            await websocket.send(_KEY_EXCHANGE_ACK_OK)
             
-            logger.info(f"Key exchange completed for {connection_state['address']}")
+            logger.info("Key exchange completed for %s", connection_state.address)
             
         except asyncio.TimeoutError:
             logger.warning("Key exchange timeout")
             raise
         except Exception as e:
             logger.error(f"Key exchange failed: {e}", exc_info=True)
-            await websocket.send(json.dumps({"type": "key_exchange_ack", "status": "error", "message": str(e)}))
+            await websocket.send(json_dumps({"type": "key_exchange_ack", "status": "error", "message": str(e)}))
             raise
             
-    async def _handle_message(self, websocket: WebSocketServerProtocol, 
-                             message: str, connection_state: Dict) -> None:
+    async def _handle_message(self, websocket: ServerConnection, 
+                             message: Union[str, bytes], connection_state: _ConnectionState) -> None:
         """Handle incoming encrypted message."""
-        if not connection_state["key_exchanged"]:
+        if not connection_state.key_exchanged:
             logger.warning("Received message before key exchange")
             return
             
         try:
-            encryption = connection_state["encryption"]
+            encryption = connection_state.encryption
             
-            # Decrypt message
-            decrypted_json = encryption.decrypt_from_transmission(message)
+            # Decrypt message (kept as UTF-8 bytes; json accepts them directly).
+            # Binary frames carry IV||ciphertext+tag with no Base64 at all;
+            # text frames use the {ivBase64}|{encryptedBase64} format.
+            if isinstance(message, bytes):
+                decrypt = encryption.decrypt_packed
+                connection_state.binary = True
+            else:
+                decrypt = encryption.decrypt_bytes_from_transmission
+                
+            # OpenSSL releases the GIL, so large payloads decrypt on a worker
+            # thread while the loop keeps serving other clients; small ones
+            # are cheaper inline than an executor round trip
+            if len(message) > DECRYPT_OFFLOAD_THRESHOLD:
+                decrypted_json = await connection_state.loop.run_in_executor(None, decrypt, message)
+            else:
+                decrypted_json = decrypt(message)
             
             # Parse ClipboardItem
             clipboard_item = ClipboardItem.from_json(decrypted_json)
             
-            logger.info(f"Received clipboard: {clipboard_item.content[:50]}...")
+            logger.info("Received clipboard: %.50s...", clipboard_item.content)
             
-            # Write to clipboard
-            ClipboardWriter.write_text(clipboard_item.content)
-            
-            # Notify callback if set
-            if self.on_clipboard_received:
-                self.on_clipboard_received(clipboard_item.content)
+            # Only the newest content matters; a single writer task drains it
+            self._pending_write = clipboard_item.content
+            if self._write_task is None or self._write_task.done():
+                self._write_task = connection_state.loop.create_task(
+                    self._write_pending_clipboard()
+                )
                 
+        except InvalidTag:
+            # Expected for wrong keys/tampered frames; skip the traceback
+            logger.warning("Dropping message from %s: authentication failed", connection_state.address)
         except Exception as e:
             logger.error(f"Error handling message: {e}", exc_info=True)
             
-    async def send_clipboard(self, websocket: WebSocketServerProtocol, 
+    async def _write_pending_clipboard(self) -> None:
+        """Write the most recent received clipboard, coalescing bursts."""
+        loop = asyncio.get_running_loop()
+        while self._pending_write is not None:
+            await asyncio.sleep(CLIPBOARD_WRITE_DELAY)
+            content, self._pending_write = self._pending_write, None
+            
+            # Clipboard writes block (pyperclip may shell out to xclip)
+            await loop.run_in_executor(None, ClipboardWriter.write_text, content)
+            
+            # Notify callback if set
+            if self.on_clipboard_received:
+                self._callback_queue.put_nowait(content)
+                
+    def _callback_worker(self) -> None:
+        """Deliver received clipboard content to on_clipboard_received."""
+        while True:
+            content = self._callback_queue.get()
+            if content is None:
+                return
+            try:
+                self.on_clipboard_received(content)
+            except Exception as e:
+                logger.error(f"Clipboard callback failed: {e}", exc_info=True)
+                
+    async def send_clipboard(self, websocket: ServerConnection, 
                             content: str) -> bool:
         """
-        Send clipboard content to connected client.
+        Queue clipboard content for a connected client.
         
         Args:
             websocket: WebSocket connection
             content: Clipboard text content
             
         Returns:
-            True if sent successfully, False otherwise
+            True if queued successfully, False otherwise
         """
-        if websocket not in self.connections:
+        # Create ClipboardItem
+        clipboard_item = ClipboardItem.create_text_item(
+            content=content,
+            source_device_id=self.device_id
+        )
+        
+        if not self._send_plaintext(websocket, clipboard_item.to_json()):
             return False
             
-        connection_state = self.connections[websocket]
+        logger.info("Queued clipboard: %.50s...", content)
+        return True
         
-        if not connection_state["key_exchanged"]:
+    def _send_plaintext(self, websocket: ServerConnection, plaintext: str) -> bool:
+        """Encrypt an already-serialized ClipboardItem for one client and queue it."""
+        connection_state = self.connections.get(websocket)
+        if connection_state is None:
+            return False
+            
+        if not connection_state.key_exchanged:
             logger.warning("Cannot send: key exchange not completed")
             return False
             
+        return self._enqueue(connection_state, plaintext)
+        
+    def _enqueue(self, connection_state: _ConnectionState, plaintext: str) -> bool:
+        """Encrypt for a key-exchanged connection and hand off to its sender task."""
         try:
-            encryption = connection_state["encryption"]
-            
-            # Create ClipboardItem
-            clipboard_item = ClipboardItem.create_text_item(
-                content=content,
-                source_device_id=self.device_id
+            encrypted_message = self._encrypt_frame(
+                connection_state.encryption, plaintext, connection_state.binary
             )
-            
-            # Encrypt and send
-            encrypted_message = encryption.encrypt_for_transmission(clipboard_item.to_json())
-            await websocket.send(encrypted_message)
-            
-            logger.info(f"Sent clipboard: {content[:50]}...")
-            return True
-            
         except Exception as e:
             logger.error(f"Error sending clipboard: {e}", exc_info=True)
             return False
             
+        self._put_frame(connection_state, encrypted_message)
+        return True
+        
+    @staticmethod
+    def _encrypt_frame(encryption: EncryptionManager, plaintext: str, 
+                       binary: bool):
+        """Encrypt in the framing the client uses (raw bytes or Base64 text)."""
+        if binary:
+            return encryption.encrypt_packed(plaintext.encode())
+        return encryption.encrypt_for_transmission(plaintext)
+        
+    @staticmethod
+    def _put_frame(connection_state: _ConnectionState, frame) -> None:
+        """Queue an encrypted frame for the connection's sender task."""
+        send_queue = connection_state.queue
+        try:
+            send_queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Only the newest clipboard matters; drop the oldest pending one
+            send_queue.get_nowait()
+            send_queue.put_nowait(frame)
+            logger.warning("Send queue full for %s, dropped a stale update", connection_state.address)
+            
     async def broadcast_clipboard(self, content: str) -> int:
         """
         Broadcast clipboard content to all connected clients.
@@ -223,38 +393,89 @@ class WebSocketServer:
         Returns:
             Number of clients that received the message
         """
-        count = 0
-        disconnected = []
+        if not self._ready:
+            return 0
+            
+        # Serialize once; only the encryption differs per client
+        plaintext = ClipboardItem.create_text_item(
+            content=content,
+            source_device_id=self.device_id
+        ).to_json()
         
-        for websocket in list(self.connections.keys()):
+        # Nothing below awaits, so _ready cannot change mid-iteration;
+        # handle_client removes closed connections itself
+        count = 0
+        if self._psk_encryption is not None:
+            # Shared key: encrypt once per framing and send the same frame to
+            # every client (each frame still gets its own fresh IV)
+            frames = {}
             try:
-                if await self.send_clipboard(websocket, content):
+                for connection_state in self._ready.values():
+                    binary = connection_state.binary
+                    frame = frames.get(binary)
+                    if frame is None:
+                        frame = frames[binary] = self._encrypt_frame(
+                            self._psk_encryption, plaintext, binary
+                        )
+                    self._put_frame(connection_state, frame)
+                    count += 1
+            except Exception as e:
+                logger.error(f"Error sending clipboard: {e}", exc_info=True)
+        else:
+            for connection_state in self._ready.values():
+                if self._enqueue(connection_state, plaintext):
                     count += 1
-            except Exception:
-                disconnected.append(websocket)
-                
-        # Clean up disconnected clients
-        for ws in disconnected:
-            if ws in self.connections:
-                del self.connections[ws]
                 
+        if count:
+            logger.info("Queued clipboard for %d client(s): %.50s...", count, content)
         return count
         
     def get_connection_count(self) -> int:
         """Get number of connected clients."""
         return len(self.connections)
         
+    def is_serving(self) -> bool:
+        """Whether start() is currently serving."""
+        return self._stop_event is not None
+        
     async def start(self, host: str = "0.0.0.0", port: int = 8765) -> None:
-        """Start WebSocket server."""
-        logger.info(f"Starting WebSocket server on {host}:{port}")
+        """Start WebSocket server and serve until stop() is called."""
+        if self._stop_requested:
+            # stop() arrived before startup finished
+            self._stop_requested = False
+            return
+        self._stop_event = asyncio.Event()
+        if self.on_clipboard_received:
+            self._callback_thread = threading.Thread(target=self._callback_worker, daemon=True)
+            self._callback_thread.start()
+        logger.info("Starting WebSocket server on %s:%d", host, port)
         
-        async with websockets.serve(
-            self.handle_client,
-            host,
-            port,
-            ssl=self.ssl_context
-        ):
-            logger.info(f"WebSocket server running on wss://{host}:{port}")
-            # Keep server running
-            await asyncio.Future()  # Run forever
+        try:
+            async with serve(
+                self.handle_client,
+                host,
+                port,
+                ssl=self.ssl_context,
+                compression=self.compression,
+                server_header=None,
+                # Don't wait the default 10 s on a peer that never answers the
+                # closing handshake (e.g. a phone that dropped off Wi-Fi)
+                close_timeout=5
+            ):
+                logger.info("WebSocket server running on wss://%s:%d", host, port)
+                await self._stop_event.wait()
+        finally:
+            # Let the callback worker drain what is queued and exit
+            if self._callback_thread is not None:
+                self._callback_queue.put_nowait(None)
+                self._callback_thread = None
+            # Leave the server startable again
+            self._stop_event = None
+            self._stop_requested = False
+            
+    def stop(self) -> None:
+        """Make start() close the listener and return (call on the server's loop)."""
+        self._stop_requested = True
+        if self._stop_event is not None:
+            self._stop_event.set()
 